@@ -8,11 +8,23 @@ try:
     # Attempt imports as if we are a package
     from .atem import ATEM
     from .camera import Camera, Pos
-    from .config import midi, cameras, midi_to_pos, program_staging, randoms, standby_positions, ATEM_IP
+    from .config import midi, cameras, midi_to_pos, program_staging, randoms, standby_positions, ATEM_IP, \
+        max_cue_age, profile_dir, state_store, move_costs
     from .midi_note import MidiNote
+    from .move_cost import MoveCostModel
+    from .profiling import Profiler
+    from .staging import cue_camera, random_position, standby_position
+    from .state import State, StateStore
+    from .transport import HttpCgiTransport, Transport, ViscaStandIn, ViscaTransport
 except ImportError:
     # Attempt imports as if we're running inside the directory
     from atem import ATEM
     from camera import Camera, Pos
-    from config import midi, cameras, midi_to_pos, program_staging, randoms, standby_positions, ATEM_IP
+    from config import midi, cameras, midi_to_pos, program_staging, randoms, standby_positions, ATEM_IP, \
+        max_cue_age, profile_dir, state_store, move_costs
     from midi_note import MidiNote
+    from move_cost import MoveCostModel
+    from profiling import Profiler
+    from staging import cue_camera, random_position, standby_position
+    from state import State, StateStore
+    from transport import HttpCgiTransport, Transport, ViscaStandIn, ViscaTransport
@@ -1,9 +1,17 @@
 import enum
 import logging
-import requests
-import threading
+import time
 from typing import Optional
 
+try:
+    from .move_cost import MoveCostModel
+    from .state import StateStore
+    from .transport import HttpCgiTransport, Transport
+except ImportError:
+    from move_cost import MoveCostModel
+    from state import StateStore
+    from transport import HttpCgiTransport, Transport
+
 
 @enum.unique
 class Pos(enum.Enum):
@@ -25,38 +33,62 @@ class Camera:
         name    A friendly name for the camera
         preset  The current known preset position
         atem    The ATEM source position
+        transport  How commands are sent to the camera
+        store   Where the preset is kept (shared with other threads)
+        costs   Learns how long this camera takes to move between presets
     """
-    def __init__(self, *, name: str, ip_address: str, num: int):
+    def __init__(self, *, name: str, ip_address: str, num: int,
+                 transport: Optional[Transport] = None,
+                 store: Optional[StateStore] = None,
+                 costs: Optional[MoveCostModel] = None):
         self.ip = ip_address
         self.name = name
         self.atem = -1
         self.num = num
-        self.preset = Pos.UNKNOWN
+        self.transport = transport or HttpCgiTransport()
+        self.store = store or StateStore()
+        self.costs = costs or MoveCostModel()
+
+    @property
+    def preset(self) -> Pos:
+        return self.store.snapshot.presets.get(self.name, Pos.UNKNOWN)
+
+    @preset.setter
+    def preset(self, value: Pos):
+        self.store.set_preset(self.name, value)
 
     def move(self, preset: Pos, callback: Optional[callable] = None):
         """ Move to specified preset"""
-        def move_callback():
+        current = self.preset
+        if preset == current:
             self._moved(preset)
             if callback:
                 callback(self)
-
-        if preset == self.preset:
-            move_callback()
             return
 
-        msg = f"Moving '{self.name}' from {self.preset.name} to {preset.name}"
+        msg = f"Moving '{self.name}' from {current.name} to {preset.name}"
         logging.info(msg)
-        cmd = f"http://{self.ip}/cgi-bin/ptzctrl.cgi?ptzcmd&poscall&{preset.value}"
+        version = self.store.begin_move(self.name)
+        started = time.monotonic()
 
-        # TESTING: Comment out these next two lines to test without cameras
-        try:
-            response = requests.get(cmd)
-            logging.debug(response)
-        except Exception:
-            logging.error("Exception thrown making camera request")
+        def move_callback(ok: bool):
+            if not ok:
+                # Leave the preset UNKNOWN and don't cut to this camera.
+                logging.error(f"Camera '{self.name}' failed to move to {preset.name}")
+                return
+            if not self.store.finish_move(self.name, preset, version):
+                # A later move has been sent to this camera.
+                logging.info(f"Discarding superseded move of '{self.name}' "
+                             f"to {preset.name}")
+                return
+            if self.transport.reports_completion:
+                self.costs.observe(self.name, current, preset,
+                                   time.monotonic() - started)
+            logging.info(f"Camera '{self.name}' at preset {preset.name}")
+            if callback:
+                callback(self)
 
-        self.preset = Pos.UNKNOWN
-        threading.Timer(1.0, move_callback).start()
+        self.transport.recall(ip=self.ip, preset=preset.value, done=move_callback)
 
     def _moved(self, preset: Pos):
         logging.info(f"Camera '{self.name}' at preset {preset.name}")
@@ -1,24 +1,56 @@
+from pathlib import Path
 
 try:
     from .camera import Pos, Camera
     from .midi_reader import MIDIReader
+    from .move_cost import MoveCostModel
+    from .state import StateStore
+    from .transport import HttpCgiTransport, ViscaTransport
 except ImportError:
     from camera import Pos, Camera
     from midi_reader import MIDIReader
+    from move_cost import MoveCostModel
+    from state import StateStore
+    from transport import HttpCgiTransport, ViscaTransport
 
 # TESTING: Choose 'loop' for Windows testing, 'IAC' for OSX production
 midi = MIDIReader(port_name='IAC')
 # midi = MIDIReader(port_name='loop')
 
+# 'HttpCgiTransport' uses the camera web interface, 'ViscaTransport'
+# uses VISCA over IP and knows when each move has finished.
+transport = HttpCgiTransport()
+# transport = ViscaTransport()
+
+# Camera presets, ATEM sources and station roles shared between threads.
+state_store = StateStore()
+
+# Camera move times, used to pick the camera for each cue.  They are only
+# learned with ViscaTransport; under HttpCgiTransport nothing is measured and
+# every move costs the model's fixed default.
+move_costs = MoveCostModel()
+
 cameras = (
-    Camera(name='booth', ip_address='192.168.2.109', num=1),
-    Camera(name='left', ip_address='192.168.2.107', num=2),
-    Camera(name='center', ip_address='192.168.2.106', num=3),
-    Camera(name='right', ip_address='192.168.2.108', num=4),
+    Camera(name='booth', ip_address='192.168.2.109', num=1, transport=transport,
+           store=state_store, costs=move_costs),
+    Camera(name='left', ip_address='192.168.2.107', num=2, transport=transport,
+           store=state_store, costs=move_costs),
+    Camera(name='center', ip_address='192.168.2.106', num=3, transport=transport,
+           store=state_store, costs=move_costs),
+    Camera(name='right', ip_address='192.168.2.108', num=4, transport=transport,
+           store=state_store, costs=move_costs),
 )
 for index, camera in enumerate(cameras):
     camera.atem = index + 1
 
+# Cues older than this many seconds when they are read from MIDI are
+# dropped rather than executed.  (Once a camera is moving, its cut is
+# only dropped if a newer cue arrives.)
+max_cue_age = 2.0
+
+# Profiling results are written next to the log from gracecam.sh
+profile_dir = Path('/tmp')
+
 # TESTING: Use .250 for Windows testing, .105 for OSX production
 ATEM_IP = "192.168.2.105"
 # ATEM_IP = "192.168.1.250"
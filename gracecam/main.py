@@ -1,16 +1,18 @@
+import functools
 import logging
-import random
 import texttable
 
 try:
     from . import (
-        ATEM, ATEM_IP, Camera, cameras, MidiNote, midi,
-        midi_to_pos, Pos, program_staging, randoms, standby_positions
+        ATEM, ATEM_IP, Camera, cameras, cue_camera, max_cue_age, MidiNote, midi,
+        midi_to_pos, move_costs, Pos, profile_dir, Profiler, program_staging,
+        random_position, randoms, standby_position, standby_positions, state_store
     )
 except ImportError:
     from __init__ import (
-        ATEM, ATEM_IP, Camera, cameras, MidiNote, midi,
-        midi_to_pos, Pos, program_staging, randoms, standby_positions
+        ATEM, ATEM_IP, Camera, cameras, cue_camera, max_cue_age, MidiNote, midi,
+        midi_to_pos, move_costs, Pos, profile_dir, Profiler, program_staging,
+        random_position, randoms, standby_position, standby_positions, state_store
     )
 
 from pathlib import Path
@@ -24,11 +26,7 @@ logging.basicConfig(
     datefmt='%M:%S')  # datefmt='%Y-%m-%d %H:%M:%S'
 
 atem = ATEM(ip_address=ATEM_IP)
-
-# This variable is used to detect when something else has changed
-# what camera is showing on the ATEM.  When that happens, we need
-# to not trust that the camera positions we have set are correct.
-lastAtemPos = -1
+profiler = Profiler(directory=profile_dir)
 
 
 class Stations:
@@ -56,11 +54,23 @@ class Stations:
                 self.preview = camera
                 logging.debug(f"Preview is currently {camera.name}")
 
-        staging = Stations().set_from_staging()
-        if staging.preview == self.preview:
-            # AHA!  staging matches current for program/preview.
-            self.standby = staging.standby
-            logging.debug(f"Standby is currently {camera.name}")
+        # Standby isn't visible on the ATEM.  Use the roles gracecam last
+        # staged, or the configured staging, if they match program/preview.
+        roles = state_store.snapshot.roles
+        staging = program_staging[self.program.name]
+        if (roles.get('program'), roles.get('preview')) == \
+                (self.program.name, self.preview.name):
+            standby_name = roles['standby']
+        elif staging['preview'] == self.preview.name:
+            standby_name = staging['standby']
+        else:
+            standby_name = None
+
+        if standby_name:
+            for camera in cameras:
+                if camera.name == standby_name:
+                    self.standby = camera
+                    logging.debug(f"Standby is currently {camera.name}")
         else:
             # They don't match: just find something.
             for camera in cameras:
@@ -71,7 +81,11 @@ class Stations:
         return self
 
     def set_from_staging(self):
-        """Read the ATEM and set preview/standby from program"""
+        """Read the ATEM program and set preview/standby from program_staging.
+
+        This only suggests the roles: nothing is sent to the ATEM until
+        stage() is called.
+        """
         program_id = atem.program
         self.program = cameras[program_id-1]
         # logging.debug(f"Program is currently {self.program.name}")
@@ -79,22 +93,40 @@ class Stations:
         for camera in cameras:
             if camera.name == staging['preview']:
                 self.preview = camera
-                atem.preview = camera.atem
                 # logging.debug(f"Preview is staged as {camera.name}")
             elif camera.name == staging['standby']:
                 self.standby = camera
                 # logging.debug(f"Standby is staged as {camera.name}")
         return self
 
+    def stage(self):
+        """Put preview on the ATEM and record the roles for set_from_atem()"""
+        atem.preview = self.preview.atem
+        state_store.set_roles(program=self.program.name,
+                              preview=self.preview.name,
+                              standby=self.standby.name)
+        return self
+
+    def cache_presets(self):
+        """Cache off the camera presets, all from the same snapshot."""
+        presets = state_store.snapshot.presets
+        self.program_preset = presets.get(self.program.name, Pos.UNKNOWN)
+        self.preview_preset = presets.get(self.preview.name, Pos.UNKNOWN)
+        self.standby_preset = presets.get(self.standby.name, Pos.UNKNOWN)
+        return self
 
-def switch(nextCamera: Optional[Camera]):
-    global lastAtemPos
 
-    prev = Stations().set_from_atem()
+@profiler.wrap
+def switch(nextCamera: Optional[Camera], cue: Optional[MidiNote] = None):
+    if cue is not None and midi.superseded(cue):
+        # The operator has moved past this cue while the camera moved.
+        # (Its age was checked before the move, in midi.get_cue().)
+        logging.warning(f"Dropping cut to '{nextCamera.name}' for '{cue}': "
+                        f"a newer cue has arrived")
+        return
+
     # Cache off the camera presets.  When the camera moves, so will the presets.
-    prev.program_preset = prev.program.preset
-    prev.preview_preset = prev.preview.preset
-    prev.standby_preset = prev.standby.preset
+    prev = Stations().set_from_atem().cache_presets()
 
     if 'UNKNOWN' in (prev.program_preset.name, prev.preview_preset.name):
         logging.info(f"Unknown camera state.  Setting up cameras")
@@ -111,26 +143,24 @@ def switch(nextCamera: Optional[Camera]):
         logging.warning(f"Moving SURPRISE camera '{nextCamera.name}' to program")
         atem.preview = nextCamera.atem
 
+    if cue is not None:
+        logging.info(f"Executing '{cue}' {cue.age:.3f}s after arrival")
     atem.exec()
     time.sleep(2.5)  # Wait for the transition to happen.
-    curr = Stations().set_from_staging()
+    curr = Stations().set_from_staging().stage()
 
-    lastAtemPos = curr.program.atem
+    state_store.set_atem(program=curr.program.atem)
 
     # Always set preview to be a random camera.
     next_preview_pos = move_preview_to_random(curr)
 
-    # Now move the standby camera.  If the standby position is already active, choose
-    # the backup standby position.
-    pos = standby_positions[0]
-    if pos in (next_preview_pos, curr.program.preset):
-        pos = standby_positions[-1]
+    # Now move the standby camera.
+    pos = standby_position(standby_positions, next_preview_pos=next_preview_pos,
+                           program_preset=curr.program.preset)
     curr.standby.move(preset=pos)
 
     time.sleep(2)
-    curr.program_preset = curr.program.preset
-    curr.preview_preset = curr.preview.preset
-    curr.standby_preset = curr.standby.preset
+    curr.cache_presets()
 
     # And make me a happy little table.
     table = texttable.Texttable(80)
@@ -154,18 +184,15 @@ def switch(nextCamera: Optional[Camera]):
 
 
 def move_preview_to_random(curr, callback=None):
-    pos = random.choice(randoms)
-    while curr.program and pos.name in (curr.program.preset.name, curr.preview.preset.name):
-        logging.debug(f"Re-picking random position '{pos.name}'")
-        pos = random.choice(randoms)
-    if curr.program and pos:
-        logging.debug(f"Random '{pos.name}' picked for preview")
+    pos = random_position(randoms, program_preset=curr.program.preset,
+                          preview_preset=curr.preview.preset)
     curr.preview.move(preset=pos, callback=callback)
     return pos
 
 
+@profiler.wrap
 def process(message: MidiNote) -> None:
-    global lastAtemPos
+    callback = functools.partial(switch, cue=message)
     curr = Stations().set_from_atem()
     try:
         velocity = message.velocity
@@ -177,31 +204,37 @@ def process(message: MidiNote) -> None:
             if curr.preview.atem == curr.program.atem:
                 # They're the same: pick a different camera.
                 curr.preview = curr.standby
-            move_preview_to_random(curr, switch)
+            move_preview_to_random(curr, callback)
             return
 
     logging.debug('-' * 60)
-    logging.info(f"Mapped '{message}' to position '{pos.name}'")
+    logging.info(f"Mapped '{message}' to position '{pos.name}' "
+                 f"({message.age:.3f}s old)")
 
-    lastAtemPos = curr.program.atem
+    state_store.set_atem(program=curr.program.atem)
 
     if velocity:
         # A velocity gives us the camera number that is required.
         for camera in cameras:
             if camera.num == velocity:
-                camera.move(preset=pos, callback=switch)
+                camera.move(preset=pos, callback=callback)
                 return
 
-    for camera in cameras:
-        if camera.preset == pos:
-            camera.move(preset=pos, callback=switch)
-            return
-
-    curr.preview.move(preset=pos, callback=switch)
+    camera = cue_camera(move_costs, cameras, pos, program=curr.program,
+                        preview=curr.preview)
+    if camera is not curr.program:
+        expected = move_costs.estimate(camera.name, camera.preset, pos)
+        logging.info(f"Chose '{camera.name}' for '{pos.name}' "
+                     f"(expected move {expected:.2f}s)")
+    camera.move(preset=pos, callback=callback)
 
 
 def main():
     logging.info("Started main()")
+    if not any(camera.transport.reports_completion for camera in cameras):
+        logging.info("Camera transport doesn't report move completion, "
+                     "so move times won't be learned")
+    profiler.install_signals()
     with midi:
         # Flush anything out there already.
         if midi.get(0.1):
@@ -211,17 +244,17 @@ def main():
             logging.info("Flush complete")
 
         while True:
-            message = midi.get()
+            message = midi.get_cue(max_age=max_cue_age)
             if message:
                 logging.debug("Processing MIDI message")
                 process(message)
                 time.sleep(0.5)
-            elif atem.program != lastAtemPos:
-                # Detected somebody else changed
-                # the program.  Assume cameras moved, too.
+            elif atem.program != state_store.snapshot.program:
+                # Detected somebody else changed the program (state only
+                # tracks what gracecam put on air).  Assume cameras moved,
+                # too, so we can't trust the presets we have set.
                 logging.info("Detected ATEM program change")
-                for camera in cameras:
-                    camera.preset = Pos.UNKNOWN
+                state_store.invalidate_presets()
             else:
                 logging.debug("No MIDI message available.")
                 time.sleep(1)
@@ -1,13 +1,27 @@
+import time
+from typing import Optional
+
+
 class MidiNote:
     NOTES = ['C', 'C#', 'D', 'D#', 'E', 'F', 'F#', 'G', 'G#', 'A', 'A#', 'B']
     OCTAVES = list(range(11))
     NOTES_IN_OCTAVE = len(NOTES)
 
-    def __init__(self, *, on: bool, channel: int, pitch: int, velocity: int):
+    def __init__(self, *, on: bool, channel: int, pitch: int, velocity: int,
+                 timestamp: Optional[float] = None, sequence: int = 0):
         self.on = on
         self.channel = channel
         self.pitch = pitch
         self.velocity = velocity
+        # Arrival time on the time.monotonic() clock.
+        self.timestamp = time.monotonic() if timestamp is None else timestamp
+        # How many NOTE ONs had arrived, including this one if it is ON.
+        self.sequence = sequence
+
+    @property
+    def age(self) -> float:
+        """ Return the number of seconds since the note arrived. """
+        return time.monotonic() - self.timestamp
 
     @property
     def off(self):
@@ -4,6 +4,7 @@ from pathlib import Path
 from queue import Queue
 import rtmidi
 from rtmidi.midiutil import open_midiinput
+import time
 from typing import List, Optional
 
 from gracecam.midi_note import MidiNote
@@ -29,6 +30,12 @@ class MIDIReader:
         self.midi_in = None  # type: Optional[rtmidi.MidiIn]
         self.port_name = port_name
         self.last_message = None
+        # Monotonic arrival time of the last MIDI message, rebuilt
+        # from the rtmidi delta times.
+        self.last_time = None  # type: Optional[float]
+        # Count of NOTE ONs, so a pending cut can tell whether the
+        # operator has moved past its cue.  (Timestamps can be equal.)
+        self.note_on_count = 0
 
     @staticmethod
     def valid_ports() -> List[str]:
@@ -47,6 +54,7 @@ class MIDIReader:
 
         _LOG.debug("MIDI port {} opened as {}".format(
             self.port_name, port_name))
+        self.last_time = None
         self.midi_in.set_callback(self._callback)
         return self
 
@@ -66,6 +74,7 @@ class MIDIReader:
         Callback for MIDI messages (called from rtmidi)
         """
         midi_message, delta_time = event
+        timestamp = self._timestamp(delta_time)
         status_byte = midi_message[0]
         if not (0x80 <= status_byte < 0xA0):
             # Not a note, too low/high.
@@ -75,7 +84,9 @@ class MIDIReader:
             item = MidiNote(on=False,
                             channel=status_byte - 0x80,
                             pitch=midi_message[1],
-                            velocity=midi_message[2])
+                            velocity=midi_message[2],
+                            timestamp=timestamp,
+                            sequence=self.note_on_count)
 
             # We don't process an OFF message if the previous message
             # was a matching ON message, so we don't double-post.
@@ -100,17 +111,73 @@ class MIDIReader:
                 
         else:
             # Note ON message
+            self.note_on_count += 1
             item = MidiNote(on=True,
                             channel=status_byte - 0x90,
                             pitch=midi_message[1],
-                            velocity=midi_message[2])
+                            velocity=midi_message[2],
+                            timestamp=timestamp,
+                            sequence=self.note_on_count)
             self.last_message = item
             self.messages.put(item)
         _LOG.debug("Found MIDI Message {}".format(item))
 
+    def _timestamp(self, delta_time: float) -> float:
+        """
+        Convert the rtmidi delta time (seconds since the previous
+        message) into a time.monotonic() arrival time.
+
+        The first message is stamped with the current time.  Later ones
+        add the delta to the previous stamp, but never run ahead of the
+        current time so that the two clocks can't drift apart.
+        """
+        now = time.monotonic()
+        if self.last_time is None:
+            timestamp = now
+        else:
+            timestamp = min(now, self.last_time + delta_time)
+        self.last_time = timestamp
+        return timestamp
+
+    def superseded(self, cue: MidiNote) -> bool:
+        """ Return True if a NOTE ON has arrived after cue. """
+        return self.note_on_count > cue.sequence
+
     def get(self, timeout=30) -> Optional[MidiNote]:
         """ Return a message if it is available. """
         try:
             return self.messages.get(timeout=timeout)
         except queue.Empty:
             return None
+
+    def get_cue(self, timeout=30,
+                max_age: Optional[float] = None) -> Optional[MidiNote]:
+        """
+        Return the newest message if one is available.
+
+        Messages queued behind it are collapsed into it: the operator
+        has already moved past them.  Only a NOTE ON replaces the held
+        message; queued NOTE OFFs belong to cues already passed (or to
+        the held one) and are discarded.  If the newest message is older
+        than max_age seconds it is dropped as well.
+        """
+        message = self.get(timeout)
+        while message is not None:
+            try:
+                newer = self.messages.get_nowait()
+            except queue.Empty:
+                break
+            if newer.off:
+                _LOG.debug("Discarding queued {}".format(newer))
+                continue
+            _LOG.info("Collapsing cue {} into newer cue {}".format(
+                message, newer))
+            message = newer
+
+        if message is not None and max_age is not None:
+            age = message.age
+            if age > max_age:
+                _LOG.warning("Dropping cue {} ({:.3f}s old)".format(
+                    message, age))
+                return None
+        return message
@@ -0,0 +1,83 @@
+import logging
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+_LOG = logging.getLogger()
+
+
+class MoveCostModel:
+    """
+    Expected time for each camera to move from one preset to another.
+
+    Camera.move reports how long each move took to settle, if its
+    transport reports completion (otherwise there is nothing real to
+    measure).  The estimate for a move is a moving average of its
+    measurements.  A move that has never been measured falls back to
+    the reverse move, then to the camera's average, then to default.  A camera
+    whose preset is unknown (usually because it is moving) costs
+    unknown.
+
+    Attributes:
+        default  Seconds for a move with nothing to go on
+        unknown  Seconds for a camera whose preset is unknown
+        weight   How much the newest measurement counts (0-1)
+        margin   Seconds another camera must save over the preferred
+                 one, covering the extra ATEM preview switch
+    """
+    def __init__(self, *, default: float = 1.0, unknown: float = 3.0,
+                 weight: float = 0.3, margin: float = 0.5):
+        self.default = default
+        self.unknown = unknown
+        self.weight = weight
+        self.margin = margin
+        self._lock = threading.Lock()
+        self._times = {}  # type: Dict[Tuple[str, str, str], float]
+
+    def observe(self, camera: str, start, end, seconds: float):
+        """ Record that camera took seconds to move from start to end. """
+        if 'UNKNOWN' in (start.name, end.name) or start == end:
+            return
+        key = (camera, start.name, end.name)
+        with self._lock:
+            if key in self._times:
+                seconds = self._times[key] + self.weight * (seconds - self._times[key])
+            self._times[key] = seconds
+        _LOG.debug(f"Move time for '{camera}' {start.name} to {end.name} "
+                   f"is now {seconds:.2f}s")
+
+    def estimate(self, camera: str, start, end) -> float:
+        """ Return the expected seconds for camera to move from start to end. """
+        if start.name == 'UNKNOWN':
+            return self.unknown
+        if start == end:
+            return 0.0
+        times = self._times
+        for key in ((camera, start.name, end.name), (camera, end.name, start.name)):
+            if key in times:
+                return times[key]
+        measured = [value for key, value in list(times.items()) if key[0] == camera]
+        if measured:
+            return sum(measured) / len(measured)
+        return self.default
+
+    def choose(self, cameras: Iterable, preset, *, exclude: Iterable = (),
+               prefer: Optional[object] = None):
+        """
+        Return the camera expected to reach preset soonest, or None if
+        every camera is excluded.
+
+        Cameras other than prefer are charged margin, so prefer only
+        loses to a camera that is clearly quicker.  Remaining ties go to
+        the order of cameras.
+        """
+        exclude = tuple(exclude)
+        best, best_cost = None, None
+        for camera in cameras:
+            if camera in exclude:
+                continue
+            cost = self.estimate(camera.name, camera.preset, preset)
+            if camera is not prefer:
+                cost += self.margin
+            if best_cost is None or cost < best_cost:
+                best, best_cost = camera, cost
+        return best
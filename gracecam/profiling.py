@@ -0,0 +1,160 @@
+import cProfile
+import functools
+import logging
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from pathlib import Path
+from typing import List, Optional
+
+_LOG = logging.getLogger()
+
+
+class Profiler:
+    """
+    Profiling that can be turned on and off while gracecam is running.
+
+    Functions decorated with wrap() are profiled with cProfile while
+    profiling is enabled, and tracemalloc tracks allocations.  Stopping
+    writes both reports to timestamped files in the directory.  While
+    disabled, a wrapped call costs a single attribute check.
+
+    Send SIGUSR1 to toggle profiling and SIGUSR2 to dump the stacks
+    of all threads (see install_signals()):
+
+    kill -USR1 <pid>
+    """
+    def __init__(self, *, directory: Path):
+        self.directory = Path(directory)
+        self.enabled = False
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._profiles = []  # type: List[cProfile.Profile]
+        self._snapshot = None  # type: Optional[tracemalloc.Snapshot]
+        self._started_tracemalloc = False
+
+    def _path(self, suffix: str) -> Path:
+        now = time.time()
+        stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(now))
+        stamp += f".{int(now * 1000) % 1000:03d}"
+        path = self.directory / f"gracecam-{stamp}{suffix}"
+        count = 1
+        while path.exists():
+            path = self.directory / f"gracecam-{stamp}-{count}{suffix}"
+            count += 1
+        return path
+
+    def start(self):
+        """ Start collecting profiles and allocations. """
+        with self._lock:
+            if self.enabled:
+                return
+            self._profiles = []
+            # Leave tracemalloc running afterwards if it already was
+            # (e.g. PYTHONTRACEMALLOC).
+            self._started_tracemalloc = not tracemalloc.is_tracing()
+            if self._started_tracemalloc:
+                tracemalloc.start(10)
+            self._snapshot = tracemalloc.take_snapshot()
+            self.enabled = True
+        _LOG.info("Profiling started")
+
+    def stop(self) -> List[Path]:
+        """ Stop collecting and write the reports.  Returns the files. """
+        with self._lock:
+            if not self.enabled:
+                return []
+            self.enabled = False
+            profiles, self._profiles = self._profiles, []
+            before, self._snapshot = self._snapshot, None
+            after = tracemalloc.take_snapshot()
+            if self._started_tracemalloc:
+                tracemalloc.stop()
+                self._started_tracemalloc = False
+
+        written = []
+        if profiles:
+            path = self._path('.prof')
+            pstats.Stats(*profiles).dump_stats(str(path))
+            written.append(path)
+        else:
+            _LOG.info("No profiled calls were made")
+
+        path = self._path('.malloc.txt')
+        with open(path, 'w') as f:
+            for stat in after.compare_to(before, 'traceback')[:25]:
+                f.write(f"{stat}\n")
+                for line in stat.traceback.format():
+                    f.write(f"{line}\n")
+                f.write("\n")
+        written.append(path)
+
+        for path in written:
+            _LOG.info(f"Profiling results written to {path}")
+        return written
+
+    def toggle(self):
+        if self.enabled:
+            self.stop()
+        else:
+            self.start()
+
+    def dump_stacks(self) -> Path:
+        """ Write the current stack of every thread to a file. """
+        names = {t.ident: t.name for t in threading.enumerate()}
+        path = self._path('.stacks.txt')
+        with open(path, 'w') as f:
+            for ident, frame in sys._current_frames().items():
+                f.write(f"Thread {names.get(ident, '?')} ({ident}):\n")
+                f.writelines(traceback.format_stack(frame))
+                f.write("\n")
+        _LOG.info(f"Thread stacks written to {path}")
+        return path
+
+    def wrap(self, func):
+        """ Decorator: profile calls to func while profiling is enabled. """
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            # Nested calls on the same thread are covered by the outer one.
+            if not self.enabled or getattr(self._local, 'active', False):
+                return func(*args, **kwargs)
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Newer Pythons allow one active profiler per process.
+                return func(*args, **kwargs)
+            self._local.active = True
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._local.active = False
+                with self._lock:
+                    if self.enabled:
+                        self._profiles.append(profile)
+        return wrapper
+
+    @staticmethod
+    def _in_background(func) -> threading.Thread:
+        """
+        Run func on its own thread.  Signal handlers run on the main
+        thread, and writing the reports there would stall the MIDI loop.
+        """
+        thread = threading.Thread(target=func, name='gracecam-profiler', daemon=True)
+        thread.start()
+        return thread
+
+    def install_signals(self):
+        """ SIGUSR1 toggles profiling, SIGUSR2 dumps thread stacks. """
+        if not hasattr(signal, 'SIGUSR1'):
+            _LOG.warning("Profiling signals are not available on this platform")
+            return
+        signal.signal(signal.SIGUSR1, lambda signum, frame: self._in_background(self.toggle))
+        signal.signal(signal.SIGUSR2, lambda signum, frame: self._in_background(self.dump_stacks))
+        _LOG.info("Profiling signals installed: SIGUSR1 toggles profiling, "
+                  "SIGUSR2 dumps thread stacks")
@@ -0,0 +1,39 @@
+import logging
+import random
+
+_LOG = logging.getLogger()
+
+
+def cue_camera(costs, cameras, pos, *, program, preview):
+    """
+    Return the camera to cut to for a cue at pos.
+
+    The program camera is used if it is already there (no cut needed).
+    Otherwise it is left out and whichever other camera should get
+    there first is used, preferring preview because it is already
+    staged on the ATEM.
+    """
+    if program.preset == pos:
+        return program
+    return costs.choose(cameras, pos, exclude=(program,), prefer=preview)
+
+
+def random_position(randoms, *, program_preset, preview_preset, rng=random):
+    """ Pick a random preview position that isn't already showing. """
+    pos = rng.choice(randoms)
+    while pos.name in (program_preset.name, preview_preset.name):
+        _LOG.debug(f"Re-picking random position '{pos.name}'")
+        pos = rng.choice(randoms)
+    _LOG.debug(f"Random '{pos.name}' picked for preview")
+    return pos
+
+
+def standby_position(standby_positions, *, next_preview_pos, program_preset):
+    """
+    Return the position for the standby camera.  If the standby position
+    is already active, choose the backup standby position.
+    """
+    pos = standby_positions[0]
+    if pos in (next_preview_pos, program_preset):
+        pos = standby_positions[-1]
+    return pos
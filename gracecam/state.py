@@ -0,0 +1,105 @@
+import dataclasses
+import threading
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Mapping, Optional
+
+
+def _frozen(mapping: Optional[dict] = None) -> Mapping:
+    return MappingProxyType(dict(mapping or {}))
+
+
+@dataclasses.dataclass(frozen=True)
+class State:
+    """An immutable snapshot of the shared gracecam state.
+
+    Attributes:
+        version  Incremented by every update
+        presets  Camera name to known preset.  Missing means unknown.
+        moves    Camera name to the version that started its latest move
+        program  The ATEM program source gracecam last put on air
+        roles    Station role (program/preview/standby) to camera name
+    """
+    version: int = 0
+    presets: Mapping[str, Any] = dataclasses.field(default_factory=_frozen)
+    moves: Mapping[str, int] = dataclasses.field(default_factory=_frozen)
+    program: int = -1
+    roles: Mapping[str, str] = dataclasses.field(default_factory=_frozen)
+
+
+class StateStore:
+    """
+    Shared state for the main thread and the camera callback threads.
+
+    Readers take snapshot, which is never modified, so they need no
+    locking.  Updates are applied one at a time, each producing a new
+    snapshot with the next version number.
+    """
+    def __init__(self):
+        self._state = State()
+        self._write_lock = threading.Lock()
+
+    @property
+    def snapshot(self) -> State:
+        return self._state
+
+    def _update(self, change: Callable[[State], Optional[Dict[str, Any]]]) -> State:
+        """
+        Apply change to the current state.  change returns the fields
+        to replace, or None to leave the state as it is.
+        """
+        with self._write_lock:
+            current = self._state
+            fields = change(current)
+            if fields is None:
+                return current
+            self._state = dataclasses.replace(
+                current, version=current.version + 1, **fields)
+            return self._state
+
+    def set_preset(self, name: str, preset):
+        def change(state: State):
+            presets = dict(state.presets)
+            presets[name] = preset
+            return dict(presets=_frozen(presets))
+        self._update(change)
+
+    def invalidate_presets(self):
+        """
+        Forget every camera preset, e.g. after an external change.  Moves
+        already under way are forgotten too, so their callbacks are
+        discarded by finish_move().
+        """
+        self._update(lambda state: dict(presets=_frozen(), moves=_frozen()))
+
+    def begin_move(self, name: str) -> int:
+        """
+        Mark the camera as moving (preset unknown).  Returns the move
+        version to hand back to finish_move().
+        """
+        def change(state: State):
+            presets = dict(state.presets)
+            presets.pop(name, None)
+            moves = dict(state.moves)
+            moves[name] = state.version + 1
+            return dict(presets=_frozen(presets), moves=_frozen(moves))
+        return self._update(change).version
+
+    def finish_move(self, name: str, preset, version: int) -> bool:
+        """
+        Record that the move started at version reached preset.  Returns
+        False (and changes nothing) if a newer move has started since.
+        """
+        def change(state: State):
+            if state.moves.get(name) != version:
+                return None
+            presets = dict(state.presets)
+            presets[name] = preset
+            return dict(presets=_frozen(presets))
+        return self._update(change).moves.get(name) == version
+
+    def set_atem(self, *, program: int):
+        self._update(lambda state: dict(program=program))
+
+    def set_roles(self, *, program: str, preview: str, standby: str):
+        roles = _frozen(dict(program=program, preview=preview, standby=standby))
+        self._update(lambda state: dict(roles=roles))
@@ -0,0 +1,182 @@
+import abc
+import logging
+import requests
+import socket
+import threading
+import time
+from typing import Callable, List, Optional
+
+_LOG = logging.getLogger()
+
+# VISCA replies: 0x90 followed by 0x4y (ACK), 0x5y (completion) or
+# 0x6y (error), where y is the socket number, terminated by 0xFF.
+_VISCA_ACK = 0x40
+_VISCA_COMPLETION = 0x50
+_VISCA_ERROR = 0x60
+
+
+class Transport(abc.ABC):
+    """
+    How a Camera sends commands to the physical camera.
+
+    recall() starts moving the camera at ip to a preset and returns
+    right away.  done(ok) is called (from another thread) once the move
+    is over: ok is True if the camera is believed to be at the preset,
+    False if the move failed.  reports_completion says whether success
+    comes from the camera (so the time taken can be measured) or is
+    just a guess.
+    """
+    reports_completion = False
+
+    @abc.abstractmethod
+    def recall(self, *, ip: str, preset: int, done: Callable[[bool], None]):
+        pass
+
+
+class HttpCgiTransport(Transport):
+    """
+    PTZOptics HTTP CGI interface.  The camera does not report when the
+    move has finished, so done is called after settle_time seconds.
+    The move fails only if the request can't be made.
+    """
+    def __init__(self, *, settle_time: float = 1.0):
+        self.settle_time = settle_time
+
+    def recall(self, *, ip: str, preset: int, done: Callable[[bool], None]):
+        cmd = f"http://{ip}/cgi-bin/ptzctrl.cgi?ptzcmd&poscall&{preset}"
+
+        ok = True
+        # TESTING: Comment out these next two lines to test without cameras
+        try:
+            response = requests.get(cmd)
+            _LOG.debug(response)
+        except Exception:
+            _LOG.error("Exception thrown making camera request")
+            ok = False
+
+        threading.Timer(self.settle_time, done, args=(ok,)).start()
+
+
+class ViscaTransport(Transport):
+    """
+    VISCA over IP (UDP).  done(True) is called when the camera sends
+    the completion reply for the preset recall.
+
+    PTZOptics cameras listen for VISCA on UDP port 1259.  Each recall
+    uses its own socket, so replies can't be confused between moves.
+    If the command can't be sent, the camera reports an error, or it
+    doesn't complete within timeout seconds, it is logged and
+    done(False) is called.
+    """
+    reports_completion = True
+
+    def __init__(self, *, port: int = 1259, timeout: float = 10.0):
+        self.port = port
+        self.timeout = timeout
+
+    @staticmethod
+    def recall_command(preset: int) -> bytes:
+        return bytes([0x81, 0x01, 0x04, 0x3F, 0x02, preset, 0xFF])
+
+    def recall(self, *, ip: str, preset: int, done: Callable[[bool], None]):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.sendto(self.recall_command(preset), (ip, self.port))
+        except OSError:
+            _LOG.error(f"Unable to send VISCA command to {ip}")
+            sock.close()
+            threading.Timer(0, done, args=(False,)).start()
+            return
+        threading.Thread(target=self._wait, args=(sock, ip, done),
+                         daemon=True).start()
+
+    def _wait(self, sock: socket.socket, ip: str, done: Callable[[bool], None]):
+        deadline = time.monotonic() + self.timeout
+        ok = False
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    _LOG.error(f"Timed out waiting for VISCA completion from {ip}")
+                    break
+                sock.settimeout(remaining)
+                try:
+                    reply = sock.recv(16)
+                except socket.timeout:
+                    continue
+                except OSError:
+                    _LOG.error(f"Error reading VISCA reply from {ip}")
+                    break
+                kind = reply[1] & 0xF0 if len(reply) > 1 else None
+                if kind == _VISCA_ACK:
+                    _LOG.debug(f"VISCA ACK from {ip}")
+                elif kind == _VISCA_COMPLETION:
+                    _LOG.debug(f"VISCA completion from {ip}")
+                    ok = True
+                    break
+                elif kind == _VISCA_ERROR:
+                    _LOG.error(f"VISCA error {reply.hex()} from {ip}")
+                    break
+                else:
+                    _LOG.warning(f"Unexpected VISCA reply {reply.hex()} from {ip}")
+        finally:
+            sock.close()
+        done(ok)
+
+
+class ViscaStandIn:
+    """
+    A local UDP stand-in for a VISCA camera, for testing without
+    cameras.  Every command is acknowledged, then completed after
+    move_time seconds.  Received commands are kept in commands.
+
+    This is a context manager object, use similar to:
+
+    with ViscaStandIn() as camera:
+        transport = ViscaTransport(port=camera.port)
+        # ...
+    """
+    def __init__(self, *, move_time: float = 0.1, ip_address: str = '127.0.0.1'):
+        self.move_time = move_time
+        self.ip = ip_address
+        self.port = None  # type: Optional[int]
+        self.commands = []  # type: List[bytes]
+        self._sock = None  # type: Optional[socket.socket]
+        self._running = False
+        self._thread = None  # type: Optional[threading.Thread]
+
+    def __enter__(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._sock.bind((self.ip, 0))
+        self._sock.settimeout(0.1)
+        self.port = self._sock.getsockname()[1]
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args, **kwargs):
+        self._running = False
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _serve(self):
+        while self._running:
+            try:
+                command, address = self._sock.recvfrom(16)
+            except socket.timeout:
+                continue
+            self.commands.append(command)
+            self._reply(bytes([0x90, _VISCA_ACK | 1, 0xFF]), address)
+            threading.Timer(self.move_time, self._reply, args=(
+                bytes([0x90, _VISCA_COMPLETION | 1, 0xFF]), address)).start()
+
+    def _reply(self, reply: bytes, address):
+        try:
+            self._sock.sendto(reply, address)
+        except (OSError, AttributeError):
+            pass  # Closed by __exit__
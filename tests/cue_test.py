@@ -0,0 +1,71 @@
+from gracecam.midi_note import MidiNote
+from gracecam.midi_reader import MIDIReader
+import time
+
+
+def note_on(reader: MIDIReader, pitch: int, delta_time: float = 0.0):
+    reader._callback(([0x90, pitch, 1], delta_time))
+
+
+def test_timestamps_follow_delta_times():
+    reader = MIDIReader(port_name='unused')
+    note_on(reader, 60)
+    first = reader.messages.get_nowait()
+    assert abs(first.age) < 0.5
+
+    # Deltas rebuild the arrival times relative to the first message...
+    reader.last_time -= 10
+    note_on(reader, 62, delta_time=4.0)
+    second = reader.messages.get_nowait()
+    assert abs(second.timestamp - (first.timestamp - 6.0)) < 0.001
+
+    # ...but never run ahead of the current time.
+    note_on(reader, 64, delta_time=60.0)
+    third = reader.messages.get_nowait()
+    assert third.timestamp <= time.monotonic()
+
+
+def test_get_cue_collapses_to_newest():
+    reader = MIDIReader(port_name='unused')
+    note_on(reader, 60)
+    note_on(reader, 62)
+    reader._callback(([0x80, 62, 0], 0.0))
+    cue = reader.get_cue(timeout=0.1)
+    assert cue.on and cue.note == 'D'
+    assert reader.messages.empty()
+
+
+def test_get_cue_drops_stale():
+    reader = MIDIReader(port_name='unused')
+    reader.messages.put(MidiNote(on=True, channel=0, pitch=60, velocity=1,
+                                 timestamp=time.monotonic() - 5.0))
+    assert reader.get_cue(timeout=0.1, max_age=2.0) is None
+    reader.messages.put(MidiNote(on=True, channel=0, pitch=60, velocity=1))
+    assert reader.get_cue(timeout=0.1, max_age=2.0) is not None
+
+
+def test_superseded_by_newer_note_on():
+    reader = MIDIReader(port_name='unused')
+    note_on(reader, 60)
+    reader._callback(([0x80, 60, 0], 0.0))
+    cue = reader.messages.get_nowait()
+    off = reader.messages.get_nowait()
+    # The cue's own NOTE OFF does not move past it...
+    assert not reader.superseded(cue)
+    assert not reader.superseded(off)
+    # ...but another NOTE ON does, even with an identical timestamp.
+    note_on(reader, 62, delta_time=0.0)
+    newer = reader.messages.get_nowait()
+    assert newer.timestamp == cue.timestamp
+    assert reader.superseded(cue)
+    assert not reader.superseded(newer)
+
+
+def test_get_cue_keeps_newest_on_with_overlapping_notes():
+    reader = MIDIReader(port_name='unused')
+    reader._callback(([0x90, 67, 2], 0.0))  # ON G, camera 2
+    reader._callback(([0x90, 60, 3], 0.0))  # ON C, camera 3
+    reader._callback(([0x80, 67, 0], 0.0))  # OFF G
+    cue = reader.get_cue(timeout=0.1)
+    assert cue.on and cue.note == 'C' and cue.velocity == 3
+    assert reader.messages.empty()
@@ -0,0 +1,205 @@
+from gracecam.camera import Camera, Pos
+from gracecam.config import midi_to_pos, program_staging, randoms, standby_positions
+from gracecam.move_cost import MoveCostModel
+from gracecam.staging import cue_camera, random_position, standby_position
+from gracecam.state import StateStore
+from gracecam.transport import Transport
+import logging
+import random
+
+_LOG = logging.getLogger(__name__)
+
+# Cues from a recorded service: seconds since the previous cue, and
+# the MIDI note.
+RECORDED_CUES = [
+    (0.0, 'D'), (6.5, 'G'), (2.0, 'D'), (14.0, 'C'), (3.5, 'C#'),
+    (1.5, 'D'), (9.0, 'A'), (4.0, 'F'), (2.5, 'D'), (20.0, 'E'),
+    (5.0, 'D'), (3.0, 'G'), (1.8, 'A'), (7.5, 'D'), (12.0, 'C'),
+    (2.2, 'E'), (4.5, 'D'), (3.0, 'F'), (1.6, 'G'), (8.0, 'D'),
+    (16.0, 'C'), (3.5, 'D'), (2.0, 'A'), (5.5, 'G'), (2.5, 'D'),
+    (10.0, 'E'), (3.0, 'C'), (1.7, 'D'), (6.0, 'F#'), (2.8, 'D'),
+    (4.0, 'G#'), (2.0, 'A'), (11.0, 'C'), (3.2, 'D'), (1.9, 'E'),
+    (6.5, 'D'), (2.4, 'A#'), (5.0, 'G'), (3.0, 'C'), (2.1, 'D'),
+]
+
+# Pan angle (degrees) of each preset as seen from each camera.
+# The booth camera is further back, so it pans less but slowly.
+ANGLES = {
+    'booth': {Pos.PULPIT: -10, Pos.LEADER: 8, Pos.ORGAN: -25, Pos.MIDDLE: 0,
+              Pos.PIANO: 22, Pos.WIDE: 0},
+    'left': {Pos.PULPIT: -5, Pos.LEADER: 40, Pos.ORGAN: -50, Pos.MIDDLE: 20,
+             Pos.PIANO: 70, Pos.WIDE: 15},
+    'center': {Pos.PULPIT: -30, Pos.LEADER: 15, Pos.ORGAN: -70, Pos.MIDDLE: 0,
+               Pos.PIANO: 45, Pos.WIDE: 0},
+    'right': {Pos.PULPIT: -60, Pos.LEADER: -10, Pos.ORGAN: -85, Pos.MIDDLE: -25,
+              Pos.PIANO: 5, Pos.WIDE: -20},
+}
+SPEEDS = {'booth': 8.0, 'left': 40.0, 'center': 40.0, 'right': 40.0}
+
+TRANSITION = 1.0  # ATEM auto transition
+PREVIEW_SWITCH = 0.3  # Extra ATEM preview change to cut a non-preview camera
+SWITCH_SLEEP = 2.5  # switch() waits this long after EXEC before restaging
+
+
+def true_move_time(name: str, start: Pos, end: Pos) -> float:
+    """ The 'real' settle time of a move in the simulation. """
+    if start == end:
+        return 0.0
+    return 0.4 + abs(ANGLES[name][start] - ANGLES[name][end]) / SPEEDS[name]
+
+
+class SimCamera:
+    """ A camera that is UNKNOWN while it moves, like Camera. """
+    def __init__(self, name: str):
+        self.name = name
+        self.target = Pos.WIDE
+        self.ready_at = 0.0
+        self.now = 0.0
+
+    @property
+    def preset(self) -> Pos:
+        return self.target if self.ready_at <= self.now else Pos.UNKNOWN
+
+
+def first_match(costs, cameras, pos, *, program, preview):
+    """ How process() picked the camera before the move cost model. """
+    for camera in cameras:
+        if camera.preset == pos:
+            return camera
+    return preview
+
+
+def simulate(choose_camera, costs: MoveCostModel, seed: int = 1) -> float:
+    """
+    Play RECORDED_CUES, picking each cue's camera with choose_camera
+    (called like cue_camera()) and restaging like switch(), and return the mean seconds
+    from cue to the end of the ATEM transition.
+
+    Cameras take true_move_time() to move and show UNKNOWN meanwhile,
+    so restaging after one cut may still be running when the next cue
+    arrives.  The model only sees noisy measurements, once each move
+    has finished.
+    """
+    rng = random.Random(seed)
+    noise = random.Random(seed + 1)
+    cameras = [SimCamera(name) for name in ('booth', 'left', 'center', 'right')]
+    by_name = {camera.name: camera for camera in cameras}
+    measurements = []
+
+    def move(camera, pos, when: float) -> float:
+        start = max(when, camera.ready_at)
+        seconds = true_move_time(camera.name, camera.target, pos)
+        measurements.append((start + seconds, camera.name, camera.target, pos,
+                             seconds * noise.uniform(0.85, 1.15)))
+        camera.target, camera.ready_at = pos, start + seconds
+        return camera.ready_at
+
+    program = cameras[0]
+    staging = program_staging[program.name]
+    preview, standby = by_name[staging['preview']], by_name[staging['standby']]
+    now = 0.0
+    latencies = []
+    for gap, note in RECORDED_CUES:
+        now += gap
+        for camera in cameras:
+            camera.now = now
+        for measurement in [m for m in measurements if m[0] <= now]:
+            measurements.remove(measurement)
+            costs.observe(*measurement[1:])
+
+        pos = midi_to_pos[note]
+        camera = choose_camera(costs, cameras, pos, program=program, preview=preview)
+        if camera is program and camera.preset == pos:
+            latencies.append(0.0)
+            continue
+        ready = move(camera, pos, now)
+        latency = ready - now + TRANSITION
+        if camera is not preview:
+            latency += PREVIEW_SWITCH
+        latencies.append(latency)
+
+        program = camera
+        restage_at = now + latency - TRANSITION + SWITCH_SLEEP
+        staging = program_staging[program.name]
+        preview, standby = by_name[staging['preview']], by_name[staging['standby']]
+        next_preview_pos = random_position(randoms, program_preset=program.target,
+                                           preview_preset=preview.preset, rng=rng)
+        move(preview, next_preview_pos, restage_at)
+        move(standby, standby_position(standby_positions, next_preview_pos=next_preview_pos,
+                                       program_preset=program.target), restage_at)
+    return sum(latencies) / len(latencies)
+
+
+def test_estimates_learn_from_observations():
+    costs = MoveCostModel(default=1.0, unknown=3.0, weight=0.5)
+    assert costs.estimate('left', Pos.UNKNOWN, Pos.ORGAN) == 3.0
+    assert costs.estimate('left', Pos.ORGAN, Pos.ORGAN) == 0.0
+    assert costs.estimate('left', Pos.PULPIT, Pos.ORGAN) == 1.0
+
+    costs.observe('left', Pos.PULPIT, Pos.ORGAN, 2.0)
+    costs.observe('left', Pos.PULPIT, Pos.ORGAN, 4.0)
+    assert costs.estimate('left', Pos.PULPIT, Pos.ORGAN) == 3.0
+    # The reverse move, then the camera average, stand in for the unmeasured.
+    assert costs.estimate('left', Pos.ORGAN, Pos.PULPIT) == 3.0
+    assert costs.estimate('left', Pos.WIDE, Pos.PIANO) == 3.0
+    assert costs.estimate('right', Pos.WIDE, Pos.PIANO) == 1.0
+
+
+def test_choose_skips_excluded_and_prefers_on_ties():
+    costs = MoveCostModel()
+    store = StateStore()
+    left, center, right = (Camera(name=name, ip_address='unused', num=1, store=store)
+                           for name in ('left', 'center', 'right'))
+    for camera in (left, center, right):
+        camera.preset = Pos.WIDE
+    assert costs.choose((left, center, right), Pos.ORGAN, prefer=right) is right
+
+    costs.observe('center', Pos.WIDE, Pos.ORGAN, 0.5)
+    assert costs.choose((left, center, right), Pos.ORGAN, prefer=right) is center
+    assert costs.choose((left, center, right), Pos.ORGAN, exclude=(center,),
+                        prefer=right) is right
+
+
+def test_preview_wins_unless_clearly_quicker():
+    costs = MoveCostModel(margin=0.5)
+    store = StateStore()
+    center, right = (Camera(name=name, ip_address='unused', num=1, store=store)
+                     for name in ('center', 'right'))
+    center.preset = right.preset = Pos.WIDE
+    # One slightly slow measurement doesn't lose to an unmeasured camera...
+    costs.observe('right', Pos.WIDE, Pos.ORGAN, 1.02)
+    assert costs.choose((center, right), Pos.ORGAN, prefer=right) is right
+    # ...but a clearly quicker camera still wins.
+    costs.observe('center', Pos.WIDE, Pos.ORGAN, 0.4)
+    assert costs.choose((center, right), Pos.ORGAN, prefer=right) is center
+
+
+class ImmediateTransport(Transport):
+    def __init__(self, reports_completion: bool):
+        self.reports_completion = reports_completion
+
+    def recall(self, *, ip: str, preset: int, done):
+        done(True)
+
+
+def test_only_reported_completions_are_measured():
+    costs = MoveCostModel()
+    store = StateStore()
+    for reports_completion in (False, True):
+        camera = Camera(name='left', ip_address='unused', num=1, store=store,
+                        costs=costs,
+                        transport=ImmediateTransport(reports_completion))
+        camera.preset = Pos.WIDE
+        camera.move(Pos.ORGAN)
+        measured = costs.estimate('left', Pos.WIDE, Pos.ORGAN) != costs.default
+        assert measured == reports_completion
+
+
+def test_simulated_latency_improves():
+    seeds = range(1, 13)
+    baseline = [simulate(first_match, MoveCostModel(), seed) for seed in seeds]
+    learned = [simulate(cue_camera, MoveCostModel(), seed) for seed in seeds]
+    _LOG.info(f"Mean cue-to-cut latency over {len(RECORDED_CUES)} cues and "
+              f"{len(seeds)} seeds: first match {sum(baseline) / len(seeds):.2f}s, "
+              f"lowest cost {sum(learned) / len(seeds):.2f}s")
+    assert all(cost < first for cost, first in zip(learned, baseline))
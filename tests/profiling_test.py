@@ -0,0 +1,64 @@
+from gracecam.profiling import Profiler
+import pstats
+import threading
+import tracemalloc
+
+
+def test_disabled_profiler_writes_nothing(tmp_path):
+    profiler = Profiler(directory=tmp_path)
+    wrapped = profiler.wrap(lambda x: x + 1)
+    assert wrapped(1) == 2
+    assert profiler.stop() == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profiling_writes_results(tmp_path):
+    profiler = Profiler(directory=tmp_path)
+
+    @profiler.wrap
+    def work():
+        return [str(i) for i in range(1000)]
+
+    profiler.toggle()
+    assert profiler.enabled
+    work()
+    written = profiler.stop()
+    assert not profiler.enabled
+    assert {path.suffix for path in written} == {'.prof', '.txt'}
+    stats = pstats.Stats(str(written[0]))
+    assert any(func[2] == 'work' for func in stats.stats)
+
+
+def test_dump_stacks(tmp_path):
+    path = Profiler(directory=tmp_path).dump_stacks()
+    assert 'test_dump_stacks' in path.read_text()
+
+
+def test_stack_dumps_do_not_overwrite(tmp_path):
+    profiler = Profiler(directory=tmp_path)
+    paths = {profiler.dump_stacks() for _ in range(3)}
+    assert len(paths) == 3
+
+
+def test_leaves_existing_tracemalloc_running(tmp_path):
+    tracemalloc.start()
+    try:
+        profiler = Profiler(directory=tmp_path)
+        profiler.start()
+        profiler.stop()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+def test_signal_work_runs_off_the_main_thread(tmp_path):
+    profiler = Profiler(directory=tmp_path)
+    writers = []
+
+    def dump():
+        writers.append(threading.current_thread())
+        profiler.dump_stacks()
+
+    profiler._in_background(dump).join(5.0)
+    assert writers and writers[0] is not threading.main_thread()
+    assert len(list(tmp_path.iterdir())) == 1
@@ -0,0 +1,65 @@
+from gracecam.camera import Camera, Pos
+from gracecam.state import StateStore
+from gracecam.transport import Transport
+import pytest
+
+
+class RecordingTransport(Transport):
+    """ Keep the 'done' callbacks so the test decides when moves finish. """
+    def __init__(self):
+        self.pending = []
+
+    def recall(self, *, ip: str, preset: int, done):
+        self.pending.append(done)
+
+
+def test_snapshots_are_immutable():
+    store = StateStore()
+    before = store.snapshot
+    store.set_preset('left', Pos.ORGAN)
+    after = store.snapshot
+    assert before.presets == {}
+    assert after.presets['left'] == Pos.ORGAN
+    assert after.version == before.version + 1
+    with pytest.raises(TypeError):
+        after.presets['left'] = Pos.WIDE
+
+
+def test_superseded_move_is_discarded():
+    store = StateStore()
+    transport = RecordingTransport()
+    camera = Camera(name='left', ip_address='unused', num=1,
+                    transport=transport, store=store)
+    called = []
+    camera.move(Pos.ORGAN, callback=called.append)
+    camera.move(Pos.PIANO, callback=called.append)
+    assert camera.preset == Pos.UNKNOWN
+
+    first, second = transport.pending
+    second(True)
+    first(True)  # Arrives late: must not overwrite the newer move.
+    assert camera.preset == Pos.PIANO
+    assert called == [camera]
+
+
+def test_invalidate_presets():
+    store = StateStore()
+    store.set_preset('left', Pos.ORGAN)
+    store.set_atem(program=2)
+    store.invalidate_presets()
+    snapshot = store.snapshot
+    assert snapshot.presets == {}
+    assert snapshot.program == 2
+
+
+def test_invalidate_discards_moves_under_way():
+    store = StateStore()
+    transport = RecordingTransport()
+    camera = Camera(name='left', ip_address='unused', num=1,
+                    transport=transport, store=store)
+    called = []
+    camera.move(Pos.ORGAN, callback=called.append)
+    store.invalidate_presets()
+    transport.pending[0](True)
+    assert camera.preset == Pos.UNKNOWN
+    assert called == []
@@ -0,0 +1,86 @@
+from gracecam.camera import Camera, Pos
+from gracecam.move_cost import MoveCostModel
+from gracecam.transport import ViscaStandIn, ViscaTransport
+import socket
+import threading
+import time
+
+
+def test_visca_recall_command():
+    assert ViscaTransport.recall_command(5) == bytes.fromhex('8101043f0205ff')
+
+
+def test_visca_completion_drives_callback():
+    with ViscaStandIn(move_time=0.2) as stand_in:
+        transport = ViscaTransport(port=stand_in.port, timeout=5.0)
+        camera = Camera(name='test', ip_address=stand_in.ip, num=1,
+                        transport=transport)
+        moved = threading.Event()
+        camera.move(Pos.ORGAN, callback=lambda c: moved.set())
+        assert camera.preset == Pos.UNKNOWN
+        assert moved.wait(5.0)
+        assert camera.preset == Pos.ORGAN
+        assert stand_in.commands == [ViscaTransport.recall_command(Pos.ORGAN.value)]
+
+
+def silent_camera() -> socket.socket:
+    """ A socket that receives VISCA commands but never replies. """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.bind(('127.0.0.1', 0))
+    return sock
+
+
+def failed_move(transport: ViscaTransport):
+    """ Start moving a camera from WIDE to ORGAN.  Returns it and its callbacks. """
+    costs = MoveCostModel()
+    camera = Camera(name='test', ip_address='127.0.0.1', num=1,
+                    transport=transport, costs=costs)
+    camera.preset = Pos.WIDE
+    called = []
+    camera.move(Pos.ORGAN, callback=called.append)
+    return camera, called
+
+
+def test_visca_timeout_reports_failure():
+    silent = silent_camera()
+    try:
+        results = []
+        started = time.monotonic()
+        ViscaTransport(port=silent.getsockname()[1], timeout=0.2).recall(
+            ip='127.0.0.1', preset=1, done=results.append)
+        deadline = time.monotonic() + 5.0
+        while not results and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert results == [False]
+        assert time.monotonic() - started >= 0.2
+        assert silent.recv(16) == ViscaTransport.recall_command(1)
+    finally:
+        silent.close()
+
+
+def test_visca_timeout_is_not_a_move():
+    silent = silent_camera()
+    try:
+        transport = ViscaTransport(port=silent.getsockname()[1], timeout=0.2)
+        camera, called = failed_move(transport)
+        time.sleep(0.6)
+        assert camera.preset == Pos.UNKNOWN
+        assert called == []
+        assert camera.costs.estimate('test', Pos.WIDE, Pos.ORGAN) == camera.costs.default
+    finally:
+        silent.close()
+
+
+def test_visca_error_reply_is_not_a_move():
+    erroring = silent_camera()
+    try:
+        transport = ViscaTransport(port=erroring.getsockname()[1], timeout=5.0)
+        camera, called = failed_move(transport)
+        command, address = erroring.recvfrom(16)
+        erroring.sendto(bytes.fromhex('906141ff'), address)
+        time.sleep(0.3)
+        assert camera.preset == Pos.UNKNOWN
+        assert called == []
+        assert camera.costs.estimate('test', Pos.WIDE, Pos.ORGAN) == camera.costs.default
+    finally:
+        erroring.close()